@@ -10,35 +10,105 @@ References:
 Required:
 - OpenCV
     (sudo apt-get install python3-opencv -y)
-- imutils
-    (pip install imutils)
+- GStreamer (Optional, OpenCV built with GStreamer for the low latency pipeline)
+    (sudo apt-get install gstreamer1.0-plugins-good gstreamer1.0-libav -y)
+- numba (Optional, JIT compilation of crc16, cached on disk after the first call)
+    (pip install numba)
+
+Notes:
+- The GStreamer pipeline drops stale frames on the client side, the latency can be reduced further on the
+  streaming server side by encoding with x264enc tune=zerolatency.
 
 """
 
 
 # Importing of the neccessary packages
-import os                                          # Required Function : stat
+import atexit                                      # Required Function : register, unregister
+import os                                          # Required Function : environ
 import time                                        # Required Function : time, sleep
 import cv2 
-from imutils.video import VideoStream
-import socket
+import numpy as np
 import logging
-import subprocess
 import threading
-import unittest                                    # Required Function : TestCase
+
+try:
+    from numba import njit                         # Required Function : njit
+except ImportError:
+    # Numba is optional, the helpers are then run by the interpreter
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+# FFmpeg capture options to avoid buffering of the RTSP stream
+FFMPEG_LOW_LATENCY_OPTIONS = "rtsp_transport;udp|max_delay;0|fflags;nobuffer|flags;low_delay"
+
+# GStreamer pipeline which scales to the image size and keeps only the newest decoded frame in the appsink
+GSTREAMER_PIPELINE = ("rtspsrc location={rtsp_url} latency=0 tcp-timeout={timeout_us} ! rtph264depay ! {decoder} ! videoscale ! "
+                      "video/x-raw,format=BGR,width={width},height={height} ! appsink max-buffers=1 drop=true sync=false")
+
+# GStreamer H.264 decoding stages: software, NVIDIA NVDEC (Jetson) and Intel VAAPI (Quick Sync)
+GSTREAMER_DECODERS = {
+    "none": "avdec_h264 ! videoconvert",
+    "nvdec": "h264parse ! nvv4l2decoder ! nvvidconv ! video/x-raw,format=BGRx ! videoconvert",
+    "vaapi": "h264parse ! vaapih264dec ! videoconvert",
+}
+
+# Number of frame buffers retrieved into in turn, a published frame is only overwritten FRAME_RING_SIZE - 1 frames later
+FRAME_RING_SIZE = 3
+
+# Lookup table of the two-character hexadecimal representation of every byte
+_HEX2 = [f"{i:02x}" for i in range(256)]
 
 
 # Basic Functionalities to convert int->hex and vice-versa
+def _make_hex(nbits: int):
+    """
+    Builds a conversion function of an integer to hexadecimal, specialized for the given number of bits.
+
+    The value is masked to the given number of bits, which also converts negative numbers to positive.
+    For 8, 16 and 32 bits, every byte is looked up in a precomputed table, avoiding the general int formatting path.
+    For other number of bits, the masked value is formatted using the 'x' format specifier and padded with leading zeros.
+
+    Params
+    ---
+    - nbits [int] : Number of bits
+
+    Returns
+    ---
+    [Callable] Function converting an integer to the string of its hexadecimal value
+    """
+    if nbits == 8:
+        def _hex(intValue: int) -> str:
+            return _HEX2[intValue & 0xFF]
+    elif nbits == 16:
+        def _hex(intValue: int) -> str:
+            value = intValue & 0xFFFF
+            return _HEX2[value >> 8] + _HEX2[value & 0xFF]
+    elif nbits == 32:
+        def _hex(intValue: int) -> str:
+            value = intValue & 0xFFFFFFFF
+            return _HEX2[value >> 24] + _HEX2[(value >> 16) & 0xFF] + _HEX2[(value >> 8) & 0xFF] + _HEX2[value & 0xFF]
+    else:
+        mask = (1 << nbits) - 1
+        width = (nbits + 3) // 4                                    # Ensures consistency in the format of the hexadecimal representation
+        def _hex(intValue: int) -> str:
+            return format(intValue & mask, 'x').zfill(width)
+    return _hex
+
+# Conversions specialized for the byte, word and double word packet fields, callers knowing the width can skip toHexVal
+toHexVal_u8 = _make_hex(8)
+toHexVal_u16 = _make_hex(16)
+toHexVal_u32 = _make_hex(32)
+_HEX_FUNCS = {8: toHexVal_u8, 16: toHexVal_u16, 32: toHexVal_u32}
+
 def toHexVal(intValue: int, 
              nbits: int=16) -> str:
     """
     Converts an integer to hexadecimal.
 
-    This function takes an integer value and the number of bits as input and converts the integer to its hexadecimal representation.
-    It first calculates the maximum value that can be represented with the given number of bits using bitwise left shift.
-    Then it validates the input value and converts any negative numbers to positive using a formula.
-    After that, it formats the validated value to its hexadecimal representation using the 'x' format specifier.
-    Finally, it ensures the consistency in the format of the hexadecimal representation by adding a leading zero if necessary.
+    Dispatches to the conversion function specialized for the given number of bits (see _make_hex),
+    which is built and cached on first use for other widths than 8, 16 and 32 bits.
+    Negative numbers are represented in two's complement on the given number of bits.
     Ref: https://www.geeksforgeeks.org/python-hex-function
 
     Params
@@ -50,14 +120,16 @@ def toHexVal(intValue: int,
     ---
     [str] String of the Hexadecimal Value
     """
-    max_nbits_value = 1<<nbits
-    validateVal = (intValue + max_nbits_value)%max_nbits_value      # Useful to convert negative numbers to positive
-    hexValue = format(validateVal, 'x')
-    return hexValue.zfill((nbits + 3) // 4)                         # Ensures consistency in the format of the hexadecimal representation
+    hex_func = _HEX_FUNCS.get(nbits)
+    if hex_func is None:
+        hex_func = _HEX_FUNCS[nbits] = _make_hex(nbits)
+    return hex_func(intValue)
 
 def toIntVal(hexValue: str) -> int:
     """
-    Coverts hexidecimal value to an integer number, which can be negative
+    Coverts hexidecimal value of a 16 bits number to an integer number, which can be negative.
+    Values fitting in 16 bits are converted and sign extended on the basis of the MSB by int.from_bytes,
+    wider values are left to signExtend16, as before.
     Ref: https://www.delftstack.com/howto/python/python-hex-to-int/#convert-hex-to-signed-integer-in-python
 
     Params
@@ -68,12 +140,86 @@ def toIntVal(hexValue: str) -> int:
     ---
     [int] Integer value of the Hexadecimal Value
     """
-    bits = 16
-    intValue: int = int(hexValue, bits)
-    if intValue & (1 << (bits-1)):                                 # Represents the negative number on the basis of the MSB
-        intValue -= 1 << bits
+    intValue: int = int(hexValue, 16)
+    if 0 <= intValue <= 0xFFFF:
+        return int.from_bytes(intValue.to_bytes(2, 'big'), 'big', signed=True)
+    return signExtend16(intValue)
+
+def toIntValFromBytes(byteValue: bytes) -> int:
+    """
+    Coverts raw big-endian bytes to an integer number, which can be negative.
+    Skips the hexadecimal string round-trip of toIntVal when the bytes are already at hand.
+
+    Params
+    ---
+    - byteValue [bytes] : Raw bytes of the value
+
+    Returns
+    ---
+    [int] Integer value of the bytes
+    """
+    return int.from_bytes(byteValue, 'big', signed=True)
+
+def signExtend16(intValue: int) -> int:
+    """
+    Represents a 16 bits integer as a signed number on the basis of the MSB, without going through a string.
+    To be used instead of toIntVal by callers already holding the integer value.
+
+    Params
+    ---
+    - intValue [int] : Unsigned 16 bits integer number
+
+    Returns
+    ---
+    [int] Signed integer value
+    """
+    if intValue & 0x8000:                                           # Represents the negative number on the basis of the MSB
+        return intValue - 0x10000
     return intValue
 
+def _crc_byte(byteValue: int) -> int:
+    """
+    Computes the CRC16 (CCITT polynomial 0x1021) of a single byte, used to build the lookup table.
+
+    Params
+    ---
+    - byteValue [int] : Byte value
+
+    Returns
+    ---
+    [int] CRC16 of the byte
+    """
+    crc = byteValue << 8
+    for _ in range(8):
+        if crc & 0x8000:
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+        else:
+            crc = (crc << 1) & 0xFFFF
+    return crc
+
+# Lookup table of the CRC16 of every byte, built once at import
+CRC16_TABLE = tuple(_crc_byte(i) for i in range(256))
+
+@njit(cache=True)
+def crc16(data: bytes) -> int:
+    """
+    Computes the CRC16 checksum (CCITT polynomial 0x1021, initial value 0, XMODEM variant) of the packet data.
+    Each byte is processed with a single lookup in CRC16_TABLE instead of a loop over its bits.
+    Ref: https://gist.github.com/oysstu/68072c44c02879a2abf94ef350d1c7c6?permalink_comment_id=3943460#gistcomment-3943460
+
+    Params
+    ---
+    - data [bytes] : Packet data
+
+    Returns
+    ---
+    [int] CRC16 checksum
+    """
+    crc = 0
+    table = CRC16_TABLE
+    for i in range(len(data)):
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ data[i]]
+    return crc
 
 
 class SIYI:
@@ -88,21 +234,40 @@ class SIYI:
         - camera_name [str]: Name of the camera
         - image_width [int]: Image width
         - image_height [int]: Image height
-        - current_frame [Any]: Current Stored frame
+        - current_frame [Any]: Current Stored frame (None once the stream is closed)
         - debug [bool]: Printing debug messages
         - logger [Logger]: Logger
-        - stopped [bool]: Stopped flag
-        - show_window [bool]: Show window
-        - last_image_time [float]: Last image time
+        - stopped [bool]: Stopped flag (read-only, set through _stop_event)
+        - show_window [bool]: Show window (to be enabled through set_show_window, which starts the display thread)
+        - last_image_time [float]: Last image time (time.monotonic)
         - connection_timeout [float]: Connection timeout
+        - target_fps [float]: Rate at which frames are decoded, 0 to decode every frame
+        - hwaccel [str]: Hardware accelerated decoding ('nvdec', 'vaapi' or 'none')
         - recv_thread [Thread]: Receive thread frame
-        - stream_video [VideoStream]: Video stream
+        - _display_thread [Thread]: Display thread of the window, None until the window is first shown
+        - _buffers [list]: Ring of preallocated frame buffers retrieved into in turn
+        - _native_buffer [ndarray]: Buffer retrieved into when the stream size differs from the image size
+        - stream_video [VideoCapture]: Video stream (GStreamer capture or FFmpeg fallback)
         """
+        # Template of the string representation, built once at import
+        _STR_TEMPLATE: str = ("Camera Name: {self.camera_name}\n"
+                              "RTSP URL: {self.rtsp_url}\n"
+                              "Image Width: {self.image_width}\n"
+                              "Image Height: {self.image_height}\n"
+                              "Current Frame: {current_frame}\n"
+                              "Debug Mode: {debug}\n"
+                              "Stopped: {stopped}\n"
+                              "Show Window: {show_window}\n"
+                              "Last Image Time: {self.last_image_time}\n"
+                              "Connection Timeout: {self.connection_timeout} seconds")
+
         def __init__(self, 
                     rtsp_url: str = "rtsp://192.168.144.25:{port}/main.264", 
                     rtsp_port: str = "8554", 
                     camera_name: str = "SIYI ZR10", 
-                    debug: bool = False) -> None:
+                    debug: bool = False,
+                    target_fps: float = 0.0,
+                    hwaccel: str = "none") -> None:
             """
             Receiving the port address of the video streaming from SIYI ZR10 Camera and initializing it.
 
@@ -112,6 +277,8 @@ class SIYI:
             - rtsp_port [str]: RTSP port
             - camera_name [str]: Name of the camera
             - debug [bool]: Printing debug messages
+            - target_fps [float]: Rate at which frames are decoded, 0 to decode every frame
+            - hwaccel [str]: Hardware accelerated decoding ('nvdec', 'vaapi' or 'none')
 
             Returns
             ---
@@ -121,15 +288,22 @@ class SIYI:
             # Setting the RTSP URL address
             self.rtsp_url: str = rtsp_url.format(port=rtsp_port)
 
+            # Hardware accelerated decoding of the GStreamer pipeline
+            if hwaccel not in GSTREAMER_DECODERS:
+                raise ValueError(f"Unknown hwaccel '{hwaccel}', expected one of {list(GSTREAMER_DECODERS)}")
+            self.hwaccel: str = hwaccel
+
             # Name of the Camera
             self.camera_name: str = camera_name
+            self._window_title: str = f"{camera_name} Stream"
 
             # Image width and height
             self.image_width: int = 1200
             self.image_height: int = 700
 
-            # Currently Stored frame
+            # Currently Stored frame, published by a single reference assignment (atomic under the GIL)
             self.current_frame: any = None
+            self._new_frame: threading.Event = threading.Event()  # Set on every published frame, to display each one once
 
             # Debug Mode
             self.debug: bool = debug
@@ -138,18 +312,38 @@ class SIYI:
             logging.basicConfig(format=log_format, level=debug_level)
             self.logger: logging.Logger = logging.getLogger(self.__class__.__name__)
 
-            # Flag to stop streaming loop
-            self.stopped: bool = False
+            # Event to stop streaming loop
+            self._stop_event: threading.Event = threading.Event()
+            self._close_lock: threading.Lock = threading.Lock()     # Only the first close_connection stops the stream
 
             # Show graphical window with frames or not
             self.show_window: bool = False
-            self.last_image_time: float = time.time()
+            self.last_image_time: float = time.monotonic()
 
             # Connection Timeout in seconds
             self.connection_timeout: float = 10.0
 
-            # Receiving Thread Handler
-            self.recv_thread: threading.Thread = threading.Thread(target=self.recv_thread_loop)
+            # Frames received in between are only grabbed, without being decoded
+            self.target_fps: float = target_fps
+            self._frame_interval: float = 1.0 / target_fps if target_fps > 0 else 0.0
+            self._last_retrieve_time: float = 0.0
+
+            # Ring of frame buffers, retrieving in place avoids allocating a new array for every frame
+            self._buffers: list = [np.empty((self.image_height, self.image_width, 3), np.uint8) for _ in range(FRAME_RING_SIZE)]
+            self._write_idx: int = 0
+
+            # Frames of another size than the image size are retrieved into this buffer, then resized into the ring
+            self._native_buffer: np.ndarray = None
+
+            # Video stream, opened by start_connection
+            self.stream_video: cv2.VideoCapture = None
+
+            # Receiving Thread Handler, daemon so that the atexit close_connection is what stops, joins and releases it
+            self.recv_thread: threading.Thread = threading.Thread(target=self.recv_thread_loop, daemon=True)
+
+            # Display Thread Handler, decoupled from the receiving thread so that waitKey does not slow down the capture.
+            # Started only once the window is enabled, headless OpenCV builds do not support any window function
+            self._display_thread: threading.Thread = None
 
             # Start Receiving Thread and Streaming
             self.start_connection()
@@ -160,267 +354,342 @@ class SIYI:
             camera name, RTSP URL, image width, image height, current frame, debug mode, 
             stopped status, show window status, last image time, and connection timeout.
             """
-            attributes = [
-            f"Camera Name: {self.camera_name}",
-            f"RTSP URL: {self.rtsp_url}",
-            f"Image Width: {self.image_width}",
-            f"Image Height: {self.image_height}",
-            f"Current Frame: {self.current_frame}",
-            f"Debug Mode: {'Enabled' if self.debug else 'Disabled'}",
-            f"Stopped: {'Yes' if self.stopped else 'No'}",
-            f"Show Window: {'Yes' if self.show_window else 'No'}",
-            f"Last Image Time: {self.last_image_time}",
-            f"Connection Timeout: {self.connection_timeout} seconds"
-            ]
-            return "\n".join(attributes)
+            return self._STR_TEMPLATE.format(self=self,
+                                             current_frame=self.get_current_frame(),
+                                             debug='Enabled' if self.debug else 'Disabled',
+                                             stopped='Yes' if self.stopped else 'No',
+                                             show_window='Yes' if self.show_window else 'No')
         
-        @property
-        def image_width(self) -> int:
-            """
-            Getter for the image_width property.
-
-            Returns
-            ---
-            int: The value of image_width.
-            """
-            return self.image_width
-        
-        @image_width.setter
-        def image_width(self, new_val: int) -> None:
+        def set_show_window(self, new_val: bool) -> None:
             """
-            Setter for the image_width property.
+            Setter for the show_window attribute, starts the display thread the first time the window is enabled.
 
             Params
             ---
-            - new_val [int]: The value to set for image_width.
+            - new_val [bool]: The value to set for show_window.
 
             Returns
             ---
             None
             """
-            self.image_width = new_val
+            self.show_window = new_val
+            if new_val and not self.stopped and (self._display_thread is None or not self._display_thread.is_alive()):
+                self._display_thread = threading.Thread(target=self._display_loop, daemon=True)
+                self._display_thread.start()
 
         @property
-        def image_height(self) -> int:
+        def stopped(self) -> bool:
             """
-            Getter for the image_height property.
+            Getter for the stopped flag.
 
             Returns
             ---
-            int: The value of image_height.
+            bool: True once the streaming loop is stopped.
             """
-            return self.image_height
-        
-        @image_height.setter
-        def image_height(self, new_val: int) -> None:
+            return self._stop_event.is_set()
+
+        def get_current_frame(self, copy: bool = False) -> any:
             """
-            Setter for the image_height property.
+            Gets the Current stored frame.
 
             Params
             ---
-            - new_val [int]: The value to set for image_height.
+            - copy [bool]: Returns a copy of the frame, which is never overwritten by the receiving thread.
 
             Returns
             ---
-            None
+            Any: The newest frame, None if no frame was received or the stream is closed.
+                 Without copy, the frame buffer is overwritten in place FRAME_RING_SIZE - 1 frames later.
             """
-            self.image_height = new_val
+            frame = self.current_frame
+            if copy and frame is not None:
+                return frame.copy()
+            return frame
 
-        @property
-        def debug(self) -> bool:
-            """
-            Getter for the debug property.
+        # Read-only access to the current frame without a method call
+        peek_frame = property(lambda self: self.current_frame,
+                              doc="The newest frame without copy, overwritten in place later, see get_current_frame.")
 
-            Returns
-            ---
-            bool: The value of debug.
-            """
-            return self.debug
-        
-        @debug.setter
-        def debug(self, new_val: bool) -> None:
+        def _publish_frame(self, frame: any) -> None:
             """
-            Setter for the debug property.
+            Replaces the current frame with the given one in a single reference assignment. The swap of the reference
+            is atomic, but the pixel data is not: the buffer is reused from the ring and overwritten in place
+            FRAME_RING_SIZE - 1 frames later, so readers keeping a frame longer must copy it (get_current_frame(copy=True)).
 
             Params
             ---
-            - new_val [bool]: The value to set for debug.
+            - frame [Any]: The frame to publish, None as sentinel once the stream is closed.
 
             Returns
             ---
             None
             """
-            self.debug = new_val
+            self.current_frame = frame
+            self._new_frame.set()
 
-        @property
-        def show_window(self) -> bool:
-            """
-            Getter for the show_window property.
-
-            Returns
-            ---
-            bool: The value of show_window.
+        def start_connection(self) -> None:
             """
-            return self.show_window
-        
-        @show_window.setter
-        def show_window(self, new_val: bool) -> None:
+            Start receiving thread and connect to the SIYI ZR10 Camera Streaming Server.
             """
-            Setter for the show_window property.
+            # Releases the stream and the threads even if the program exits without closing the connection
+            atexit.register(self.close_connection)
 
-            Params
-            ---
-            - new_val [bool]: The value to set for show_window.
+            try:
+                self.logger.info("Welcome to %s.\nConnecting to %s...", self.camera_name, self.rtsp_url)
 
-            Returns
-            ---
-            None
-            """
-            self.show_window = new_val
-        
-        def set_show_window(self, new_val: bool) -> None:
+                # GStreamer pipeline dropping the stale frames inside the appsink
+                self.stream_video: cv2.VideoCapture = self.open_gstreamer_stream(self.hwaccel)
+
+                if not self.stream_video.isOpened() and self.hwaccel != "none":
+                    # Hardware decoder is not available, falling back to software decoding
+                    self.logger.warning("Could not open %s GStreamer pipeline. Falling back to software decoding...", self.hwaccel)
+                    self.stream_video.release()
+                    self.stream_video: cv2.VideoCapture = self.open_gstreamer_stream("none")
+
+                if not self.stream_video.isOpened():
+                    # OpenCV is built without GStreamer, falling back to FFmpeg
+                    self.logger.warning("Could not open GStreamer pipeline. Falling back to FFmpeg...")
+                    self.stream_video.release()
+
+                    # Low latency FFmpeg options, they must be set before the capture is opened (can be overridden from the environment)
+                    os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", FFMPEG_LOW_LATENCY_OPTIONS)
+                    self.stream_video: cv2.VideoCapture = self.open_ffmpeg_stream()
+
+                    if not self.stream_video.isOpened():
+                        raise ConnectionError("Could not open the stream with GStreamer nor FFmpeg")
+
+                    # Keeps only the newest frame in the capture buffer
+                    self.stream_video.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+                # Requests the image size from the source, frames of another size are still resized on reception
+                self.stream_video.set(cv2.CAP_PROP_FRAME_WIDTH, self.image_width)
+                self.stream_video.set(cv2.CAP_PROP_FRAME_HEIGHT, self.image_height)
+
+                self.recv_thread.start()
+
+            except ConnectionError as conn_err:
+                # Handle connection error gracefully, such as retrying or logging and continuing with the program.
+                self.logger.error("Could not establish connection to %s. Error: %s", self.camera_name, conn_err)
+                self.close_connection()
+                exit(1)
+
+            except FileNotFoundError as file_err:
+                # Handle file not found error appropriately.
+                self.logger.error("Could not find file: %s", file_err.filename)
+                self.close_connection()
+                exit(1)
+
+            except Exception as other_err:
+                # Handle other exceptions as needed.
+                self.logger.error("An error occurred while connecting to %s. Error: %s", self.camera_name, other_err)
+                self.close_connection()
+                exit(1)
+
+        def open_gstreamer_stream(self, hwaccel: str) -> cv2.VideoCapture:
             """
-            Setter for the show_window property.
+            Opens the GStreamer capture of the RTSP stream.
 
             Params
             ---
-            - new_val [bool]: The value to set for show_window.
+            - hwaccel [str]: Hardware accelerated decoding ('nvdec', 'vaapi' or 'none')
 
             Returns
             ---
-            None
+            VideoCapture: The capture, not opened if the pipeline could not be constructed.
             """
-            self.show_window = new_val
+            pipeline: str = GSTREAMER_PIPELINE.format(rtsp_url=self.rtsp_url, decoder=GSTREAMER_DECODERS[hwaccel],
+                                                      width=self.image_width, height=self.image_height,
+                                                      timeout_us=int(self.connection_timeout * 1e6))
+            return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
 
-        @property
-        def stopped(self) -> bool:
+        def fit_frame(self, frame: np.ndarray, dst: np.ndarray = None) -> np.ndarray:
             """
-            Getter for the stopped property.
-
-            Returns
-            ---
-            bool: The value of stopped.
-            """
-            return self.stopped
-        
-        @stopped.setter
-        def stopped(self, new_val: bool) -> None:
-            """
-            Setter for the stopped property.
+            Resizes the frame to the image width and height, if it does not already have this size.
 
             Params
             ---
-            - new_val [bool]: The value to set for stopped.
+            - frame [ndarray]: The frame to resize
+            - dst [ndarray]: Buffer to resize into, used only if it has the image size
 
             Returns
             ---
-            None
+            ndarray: The frame with the image size.
             """
-            self.stopped = new_val
+            size: tuple = (self.image_width, self.image_height)
+            if frame.shape[1] == size[0] and frame.shape[0] == size[1]:
+                return frame
 
-        @property
-        def connection_timeout(self) -> float:
-            """
-            Getter for the connection_timeout property.
+            if dst is not None and dst.shape[1] == size[0] and dst.shape[0] == size[1]:
+                return cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+            return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
 
-            Returns
-            ---
-            float: The value of connection_timeout.
-            """
-            return self.connection_timeout
-        
-        @connection_timeout.setter
-        def connection_timeout(self, new_val: float) -> None:
+        def open_ffmpeg_stream(self) -> cv2.VideoCapture:
             """
-            Setter for the connection_timeout property.
-
-            Params
-            ---
-            - new_val [float]: The value to set for connection_timeout.
+            Opens the FFmpeg capture of the RTSP stream, with open and read timeouts of connection_timeout,
+            so that a stalled stream does not block grab before the connection timeout is checked.
 
             Returns
             ---
-            None
+            VideoCapture: The capture, not opened if the stream could not be opened.
             """
-            self.connection_timeout = new_val
+            if not hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
+                # Timeout parameters are only supported by OpenCV 4.5.2+
+                return cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
+
+            timeout_ms: int = int(self.connection_timeout * 1000)
+            return cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG,
+                                    [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
 
-        def get_current_frame(self) -> any:
+        def _displaying(self) -> bool:
             """
-            Gets the Current stored frame.
+            Checks whether the window is enabled and the display thread is running to show it.
 
             Returns
             ---
-            Any: The value of current_frame.
+            bool: True if frames are currently displayed, False otherwise.
             """
-            if self.current_frame is None:
-                return None
-            return self.current_frame
+            display_thread = self._display_thread
+            return self.show_window and display_thread is not None and display_thread.is_alive()
 
-        def start_connection(self) -> None:
-            """
-            Start receiving thread and connect to the SIYI ZR10 Camera Streaming Server.
+        def receive_frame(self) -> bool:
             """
-            try:
-                self.logger.info("Welcome to %s.\nConnecting to %s...", self.camera_name, self.rtsp_url)
-                self.stream_video: VideoStream = VideoStream(self.rtsp_url).start()
-                self.recv_thread.start()
+            Receives the newest frame from the video stream, resized to the image size, and stores it as the current frame.
+            The frame is always grabbed to keep the decoder state, but only retrieved
+            once per frame interval (or always while the display thread shows the window), in place into the ring of buffers.
 
-            except ConnectionError as conn_err:
-                # Handle connection error gracefully, such as retrying or logging and continuing with the program.
-                self.logger.error("Could not establish connection to %s. Error: %s", self.cameraName, conn_err)
-                exit(1)
-
-            except FileNotFoundError as file_err:
-                # Handle file not found error appropriately.
-                self.logger.error("Could not find file: %s", file_err.filename)
-                exit(1)
-
-            except Exception as other_err:
-                # Handle other exceptions as needed.
-                self.logger.error("An error occurred while connecting to %s. Error: %s", self.cameraName, other_err)
-                exit(1)
+            Returns
+            ---
+            bool: True if a frame was received from the stream, False otherwise.
+            """
+            if not self.stream_video.grab():
+                return False
+
+            current_time: float = time.monotonic()
+            if current_time - self._last_retrieve_time >= self._frame_interval or self._displaying():
+                buffer = self._buffers[self._write_idx]
+                native_buffer = self._native_buffer
+                ret, frame = self.stream_video.retrieve(buffer if native_buffer is None else native_buffer)
+                # Nothing is published anymore once the connection is closing, after the None sentinel
+                if ret and not self._stop_event.is_set():
+                    if frame.shape[0] == self.image_height and frame.shape[1] == self.image_width:
+                        # Retrieved in place into the ring (a new array, if the size changed, is the buffer from now on)
+                        self._native_buffer = None
+                    else:
+                        # Kept for the next retrieve, OpenCV allocates a new one only if the stream size changes
+                        self._native_buffer = frame
+                        frame = self.fit_frame(frame, buffer)
+                    self._buffers[self._write_idx] = frame
+                    self._publish_frame(frame)
+                    self._write_idx = (self._write_idx + 1) % FRAME_RING_SIZE
+                    self._last_retrieve_time = current_time
+            return True
 
         def recv_thread_loop(self) -> None:
             """
             A function to continuously receive frames from a video stream and perform various operations on the frames.
             """
-            self.last_image_time = time.time()
-            while not self.stopped:
-                self.logger.debug("Reading frame from %s ...", self.camera_name)
-                self.current_frame = self.stream_video.read()
-
-                current_image_time: float = time.time()
-                if current_image_time - self.last_image_time > self.connection_timeout:
-                    self.logger.warning("Connection timeout. Exiting...")
+            # Local lookups in the receiving loop
+            stop_is_set = self._stop_event.is_set
+            receive_frame = self.receive_frame
+            debug = self.logger.debug
+            warn = self.logger.warning
+            monotonic = time.monotonic
+            debug_enabled: bool = self.logger.isEnabledFor(logging.DEBUG)
+
+            last_image_time: float = monotonic()
+            self.last_image_time = last_image_time
+            while not stop_is_set():
+                if debug_enabled:
+                    debug("Reading frame from %s ...", self.camera_name)
+                frame_received: bool = receive_frame()
+
+                current_image_time: float = monotonic()
+                if current_image_time - last_image_time > self.connection_timeout:
+                    warn("Connection timeout. Exiting...")
                     self.close_connection()
                     break
                 
-                if self.current_frame is None:
+                if not frame_received:
                     continue
 
+                last_image_time = current_image_time
                 self.last_image_time = current_image_time
 
-                if self.show_window:
-                    cv2.imshow('{} Stream'.format(self.camera_name), self.current_frame)
-                    
-                    key = cv2.waitKey(25) & 0xFF
-
-                    if key == ord('q'):
-                        self.close_connection()
-                        break
-
+            # The receiving thread owns the stream, it is released here in case close_connection could not join it
+            self.stream_video.release()
+            self._publish_frame(None)
             self.logger.warning("RTSP receiving loop is done...")
             return
+
+        def _display_loop(self) -> None:
+            """
+            A function to continuously display the newest received frame while show_window is enabled, and to close the
+            connection when 'q' is pressed.
+            """
+            # pollKey (OpenCV 4.5+) handles the window events without blocking
+            poll_key = cv2.pollKey if hasattr(cv2, "pollKey") else lambda: cv2.waitKey(1)
+
+            window_shown: bool = False
+            stop_is_set = self._stop_event.is_set
+            while not stop_is_set():
+                if not self.show_window:
+                    if window_shown:
+                        cv2.destroyWindow(self._window_title)
+                        window_shown = False
+                    self._stop_event.wait(0.1)
+                    continue
+
+                # Waits for a new frame, but keeps handling the window events at least every 10 ms
+                if self._new_frame.wait(0.01):
+                    self._new_frame.clear()
+                    frame = self.get_current_frame()
+                    if frame is not None:
+                        try:
+                            cv2.imshow(self._window_title, frame)
+                        except cv2.error as gui_err:
+                            # Headless OpenCV builds do not support any window function
+                            self.logger.error("Could not show the window of %s. Error: %s", self.camera_name, gui_err)
+                            return
+                        window_shown = True
+
+                if not window_shown:
+                    continue
+
+                key = poll_key() & 0xFF
+
+                if key == ord('q'):
+                    self.close_connection()
+                    break
+
+            if window_shown:
+                cv2.destroyWindow(self._window_title)
             
         def close_connection(self) -> None:
             """
             Closes the connection and stops the video stream.
+            The receiving and display threads are stopped and joined (with a timeout) before releasing the stream.
             """
+            # Closing on timeout and on 'q' key at the same time must not make both threads join each other
+            with self._close_lock:
+                if self._stop_event.is_set():
+                    return
+                self._stop_event.set()
+
             self.logger.info("Closing stream of %s...", self.camera_name)
             self.logger.info("Disconnecting %s ...", self.rtsp_url)
-            cv2.destroyAllWindows()
-            self.stream_video.stop()
-            self.stopped = True
+
+            # The thread calling close_connection (e.g. on timeout or 'q' key) can not join itself
+            for thread in (self.recv_thread, self._display_thread):
+                if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+                    thread.join(timeout=2.0)
+
+            if self.recv_thread.is_alive() and self.recv_thread is not threading.current_thread():
+                # Releasing while the receiving thread is inside grab is unsafe, it releases the stream itself on exit
+                self.logger.warning("Receiving thread of %s is still running. Leaving the stream release to it...", self.camera_name)
+            elif self.stream_video is not None:
+                self.stream_video.release()
+            self._publish_frame(None)
+            atexit.unregister(self.close_connection)
 
 
 